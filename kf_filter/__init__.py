@@ -2,7 +2,8 @@ from .kf_filter import KF
 from .util import (
     kf_mask,
     wave_mask,
-    td_mask
+    td_mask,
+    clear_mask_cache
 )
 
-__all__ = ["KF", "kf_mask", "wave_mask", "td_mask"]
\ No newline at end of file
+__all__ = ["KF", "kf_mask", "wave_mask", "td_mask", "clear_mask_cache"]
\ No newline at end of file
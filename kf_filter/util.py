@@ -12,11 +12,13 @@ from kf_filter.consts import (
     beta,
     wave_func,
     wave_types,
-    wave_args
+    wave_args,
+    filter_dict
 )
 
-from functools import reduce
+import math
 import operator
+from functools import lru_cache, partial
 
 def harmonic_func(n, period=365, num_fs=4):
     """
@@ -38,12 +40,28 @@ def harmonic_func(n, period=365, num_fs=4):
     func : np.ndarray
         The matrix to regress on to the original timeseries.
     """
-    func = np.zeros((num_fs*2+1, n), dtype=float)
-    time = np.arange(0, n) * 2 * np.pi / period
-    func[0, :] = np.ones(n)
-    for i in range(num_fs):
-        func[2*i+1, :] = np.sin(i * time)
-        func[(i+1)*2, :] = np.cos(i * time)
+    func = np.empty((num_fs*2+1, n), dtype=float)
+    func[0, :] = 1.0
+
+    # Rows alternate sin(i * time), cos(i * time) for i = 0, 1, ...
+    sins = func[1::2]
+    coss = func[2::2]
+    if num_fs > 0:
+        sins[0, :] = 0.0
+        coss[0, :] = 1.0
+    if num_fs > 1:
+        time = np.arange(0, n) * (2 * np.pi / period)
+        np.sin(time, out=sins[1])
+        np.cos(time, out=coss[1])
+
+        # Higher harmonics from the Chebyshev recurrence
+        # f((i+1) t) = 2 cos(t) f(i t) - f((i-1) t), for f = sin, cos
+        two_cos = 2 * coss[1]
+        for i in range(2, num_fs):
+            np.multiply(two_cos, sins[i-1], out=sins[i])
+            sins[i] -= sins[i-2]
+            np.multiply(two_cos, coss[i-1], out=coss[i])
+            coss[i] -= coss[i-2]
     return func
 
 def split_hann_taper(series_length, fraction):
@@ -72,14 +90,26 @@ def split_hann_taper(series_length, fraction):
     XTAPER = (X - X.mean())*series_taper + X.mean()
     """
     npts = int(np.rint(fraction * series_length))  # total size of taper
-    taper = np.hanning(npts)
     series_taper = np.ones(series_length)
-    series_taper[0 : npts // 2 + 1] = taper[0 : npts // 2 + 1]
-    series_taper[-npts // 2 + 1 :] = taper[npts // 2 + 1 :]
+    if npts < 2:
+        return series_taper
+
+    # np.hanning(npts) is 0.5 + 0.5 * cos(pi * n / (npts - 1)) for
+    # n = 1 - npts, 3 - npts, ..., npts - 1, which is exactly symmetric,
+    # so only the head is evaluated (in place) and mirrored to the tail
+    n_head = npts // 2 + 1
+    n_tail = npts - n_head
+    head = series_taper[:n_head]
+    np.multiply(np.arange(1 - npts, 1 - npts + 2 * n_head, 2), np.pi, out=head)
+    np.divide(head, npts - 1, out=head)
+    np.cos(head, out=head)
+    np.multiply(head, 0.5, out=head)
+    np.add(head, 0.5, out=head)
+    series_taper[series_length - n_tail:] = head[:n_tail][::-1]
     return series_taper
 
 def _combine_plus_minus(logical_plus : list, 
-                        logical_minus : list) -> xr.DataArray:
+                        logical_minus : list) -> np.ndarray:
     """
     Combine masks from positive frequency domain
     with that from negative frequency domain.
@@ -93,42 +123,90 @@ def _combine_plus_minus(logical_plus : list,
 
     Returns
     -------
-    mask : xr.DataArray
-        Combined mask.
+    mask : np.ndarray
+        Combined (frequency, wavenumber) mask.
+
+    Notes
+    -----
+    All conditions are boolean np.ndarray broadcastable to
+    (frequency, wavenumber), and the two lists are paired element-wise.
+    Each pair is packed into one uint8 array (bit 0 for positive and
+    bit 1 for negative frequencies), so both sides are combined with a
+    single bitwise AND per condition.
     """
-    omega_plus = reduce(lambda x, y: xr.apply_ufunc(xr.ufuncs.logical_and, x, y), logical_plus)
-    omega_minus = reduce(lambda x, y: xr.apply_ufunc(xr.ufuncs.logical_and, x, y), logical_minus)
+    if len(logical_plus) != len(logical_minus):
+        raise ValueError('"logical_plus" and "logical_minus" must have the same length.')
+
+    codes = [plus.view(np.uint8) | (minus.view(np.uint8) << 1)
+             for plus, minus in zip(logical_plus, logical_minus)]
+
+    # The codes are fresh arrays, so AND in place as soon as the
+    # running mask already has the broadcast shape
+    mask = codes[0]
+    for code in codes[1:]:
+        if mask.shape == np.broadcast_shapes(mask.shape, code.shape):
+            np.bitwise_and(mask, code, out=mask)
+        else:
+            mask = mask & code
+
+    return mask != 0
+
+def _dim_k_omega(wavenumber : np.ndarray,
+                 frequency : np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    r"""Convert k and \omega to SI units, independent of the equivalent depth.
 
-    return xr.ufuncs.logical_or(omega_plus, omega_minus)
+    Returns
+    -------
+    k_dim, omega_dim : tuple[np.ndarray, np.ndarray]
+        Wavenumber in m^-1 and angular frequency in s^-1.
+    """
+    # First convert to wavenumber per Earth radius (m^1)
+    k_dim = wavenumber / radius_earth
+
+    # Here we convert linear frequency from np.fftfreq to 
+    # angular frequency
+    omega_dim = frequency * 2 * np.pi / (24 * 3600)
 
-def _nondim_k_omega(wavenumber : xr.DataArray | np.ndarray,
-                    frequency : xr.DataArray | np.ndarray,
-                    h : float) -> tuple[xr.DataArray, xr.DataArray]:
+    return k_dim, omega_dim
+
+@lru_cache(maxsize=32)
+def _h_factors(h : float) -> tuple[float, float]:
+    r"""Scale factors of k and \omega for the equivalent depth h.
+
+    Returns
+    -------
+    k_factor, omega_factor : tuple[float, float]
+        k_nondim = k_dim * k_factor, omega_nondim = omega_dim / omega_factor.
+    """
+    c = math.sqrt(g * h)
+    return math.sqrt(c / beta), math.sqrt(beta * c)
+
+def _nondim_k_omega(k_dim : np.ndarray,
+                    omega_dim : np.ndarray,
+                    h : float) -> tuple[np.ndarray, np.ndarray]:
     r"""Non-dimensionalize k and \omega based on the equivalent depth.
 
     Parameters
     ----------
+    k_dim, omega_dim : np.ndarray
+        Wavenumber and angular frequency from `_dim_k_omega`.
+
     h : float
         Equivalent depth in meters.
 
     Returns
-    k_nondim, omega_nondim : tuple[xr.DataArray, xr.DataArray]
+    k_nondim, omega_nondim : tuple[np.ndarray, np.ndarray]
 
     Notes
     -----
     c = sqrt(g * h)
     """
-    wavenumber, frequency = _wrap_to_xarray(wavenumber, frequency)
-    
-    c = np.sqrt(g * h)
+    k_factor, omega_factor = _h_factors(float(h))
 
-    # First convert to wavenumber per Earth radius (m^1)
-    # before we nondimensionalize it according to Vallis (2012)
-    k_nondim = wavenumber / radius_earth * np.sqrt(c / beta)
-
-    # Here we convert linear frequency from np.fftfreq to 
-    # angular frequency
-    omega_nondim = frequency * 2 * np.pi / (24 * 3600) / np.sqrt(beta * c)
+    # Nondimensionalize according to Vallis (2012); only scalar
+    # factors depend on h
+    k_nondim = k_dim * k_factor
+    omega_nondim = omega_dim / omega_factor
 
     # return nondimensionalized k, \omega
     return k_nondim, omega_nondim
@@ -146,13 +224,296 @@ def _wrap_to_xarray(wavenumber : np.ndarray,
 
     return wavenumber, frequency
 
+def _check_bounds(fmin: float | None = None, 
+                  fmax: float | None = None, 
+                  kmin: int | None = None, 
+                  kmax: int | None = None) -> None:
+    """
+    Check the min/max frequency and wavenumber before any mask is built.
+    """
+    if fmin is not None and not fmin > 0:
+        raise ValueError('Frequency "fmin" must be greater than 0.')
+
+    if fmax is not None and not fmax > 0:
+        raise ValueError('Frequency "fmax" must be greater than 0.')
+
+    if (fmin is not None) and (fmax is not None) and not fmin < fmax:
+        raise ValueError('"fmin" should be smaller than "fmax".')
+
+    if (kmin is not None) and (kmax is not None) and not kmin < kmax:
+        raise ValueError('Wavenumber "kmin" should be smaller than "kmax".')
+
+def _apply_mask(kernel,
+                wavenumber : xr.DataArray,
+                frequency : xr.DataArray,
+                **kwargs) -> xr.DataArray:
+    """
+    Apply a NumPy mask kernel to wavenumber and frequency.
+
+    `kernel(wavenumber, frequency, **kwargs)` takes the 1-D axes and
+    returns a (frequency, wavenumber) boolean array.
+
+    Notes
+    -----
+    wavenumber and frequency are core dimensions, since the kernels need
+    the whole axes. Dask-backed inputs are evaluated lazily, but each axis
+    must be a single chunk and the mask is built as one block.
+    """
+    return xr.apply_ufunc(kernel,
+                          wavenumber,
+                          frequency,
+                          kwargs=kwargs,
+                          input_core_dims=[list(wavenumber.dims), list(frequency.dims)],
+                          output_core_dims=[list(frequency.dims + wavenumber.dims)],
+                          dask='parallelized',
+                          output_dtypes=[bool])
+
+def _evaluate_kernel(kernel,
+                     wavenumber_key : tuple[bytes, str],
+                     frequency_key : tuple[bytes, str],
+                     kwargs_key : tuple) -> np.ndarray | tuple:
+    """
+    Evaluate a mask kernel on axes given as (bytes, dtype).
+
+    The returned arrays are read-only since they are shared between calls.
+    """
+    wavenumber = np.frombuffer(*wavenumber_key)
+    frequency = np.frombuffer(*frequency_key)
+
+    mask = kernel(wavenumber, frequency, **dict(kwargs_key))
+    _set_read_only(mask)
+    return mask
+
+# A full (frequency, wavenumber) mask is ~10 MB on a 720 x 14600 grid,
+# so only keep enough of them for every wave type on one grid
+@lru_cache(maxsize=8)
+def _cached_mask(kernel,
+                 wavenumber_key : tuple[bytes, str],
+                 frequency_key : tuple[bytes, str],
+                 kwargs_key : tuple) -> np.ndarray:
+    """Cache of full 2-D masks from `_memoized_kernel`."""
+    return _evaluate_kernel(kernel, wavenumber_key, frequency_key, kwargs_key)
+
+# Bounding boxes are only 1-D, so they get a separate cache and
+# do not evict the 2-D masks
+@lru_cache(maxsize=32)
+def _cached_bbox(wavenumber_key : tuple[bytes, str],
+                 frequency_key : tuple[bytes, str],
+                 kwargs_key : tuple) -> tuple[tuple, tuple]:
+    """Cache of the 1-D bounding boxes from `_bbox_predicates_1d`."""
+    return _evaluate_kernel(_bbox_kernel, wavenumber_key, frequency_key, kwargs_key)
+
+def clear_mask_cache() -> None:
+    """
+    Clear the cached masks and bounding boxes.
+
+    `wave_mask` and `td_mask` keep the most recent masks for reuse
+    on the same grid; call this to release their memory.
+    """
+    _cached_mask.cache_clear()
+    _cached_bbox.cache_clear()
+
+def _set_read_only(result : np.ndarray | tuple) -> None:
+    """Mark an array, or the arrays in nested tuples, read-only."""
+    if isinstance(result, tuple):
+        for item in result:
+            _set_read_only(item)
+    else:
+        result.flags.writeable = False
+
+def _axis_key(axis : np.ndarray) -> tuple[bytes, str]:
+    """Hashable (bytes, dtype) key of a 1-D axis for the mask caches."""
+    return axis.tobytes(), axis.dtype.str
+
+def _kwargs_key(kwargs : dict) -> tuple | None:
+    """Hashable key of the mask parameters, or None if one is unhashable."""
+    key = tuple(sorted(kwargs.items()))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+def _memoized_kernel(wavenumber : np.ndarray,
+                     frequency : np.ndarray,
+                     mask_kernel,
+                     **kwargs) -> np.ndarray:
+    """
+    Look up `mask_kernel(wavenumber, frequency, **kwargs)` in the mask cache.
+
+    Masks are deterministic in their parameters and axes, so filtering
+    many datasets on the same grid only builds each mask once.
+    Parameters that cannot be hashed (e.g. 0-d arrays) skip the cache.
+
+    The cached mask is read-only, so a writeable copy is returned.
+    """
+    kwargs_key = _kwargs_key(kwargs)
+    if kwargs_key is None:
+        return mask_kernel(wavenumber, frequency, **kwargs)
+
+    return _cached_mask(mask_kernel,
+                        _axis_key(wavenumber),
+                        _axis_key(frequency),
+                        kwargs_key).copy()
+
+def _bbox_predicates_1d(wavenumber : np.ndarray,
+                        frequency : np.ndarray,
+                        fmin: float | None = None, 
+                        fmax: float | None = None, 
+                        kmin: int | None = None, 
+                        kmax: int | None = None) -> tuple[tuple, tuple]:
+    """
+    Bounding box of `kf_mask` on the 1-D axes.
+
+    Returns
+    -------
+    logical_plus, logical_minus : tuple[tuple, tuple]
+        Bounding box conditions for positive and negative frequencies,
+        as (frequency condition, wavenumber condition) on the 1-D axes.
+
+    Notes
+    -----
+    The boxes are cached, so masks for several wave types sharing the
+    same bounds only compare the axes once. The arrays are read-only.
+    """
+    kwargs = dict(fmin=fmin, fmax=fmax, kmin=kmin, kmax=kmax)
+    kwargs_key = _kwargs_key(kwargs)
+    if kwargs_key is None:
+        return _bbox_kernel(wavenumber, frequency, **kwargs)
+
+    return _cached_bbox(_axis_key(wavenumber),
+                        _axis_key(frequency),
+                        kwargs_key)
+
+def _bbox_kernel(wavenumber : np.ndarray,
+                 frequency : np.ndarray,
+                 fmin: float | None = None, 
+                 fmax: float | None = None, 
+                 kmin: int | None = None, 
+                 kmax: int | None = None) -> tuple[tuple, tuple]:
+    """NumPy kernel of `_bbox_predicates_1d`."""
+    # do separately for positive and negative omega; frequency-only and
+    # wavenumber-only conditions are kept on their own 1-D axes.
+    # The bounds are checked by `_check_bounds`; since fmin > 0,
+    # (frequency > fmin) already implies (frequency > 0)
+    if fmin is not None:
+        f_plus = frequency > fmin  # bounding box for positive omega
+        f_minus = frequency < -fmin  # bounding box for negative omega
+    else:
+        f_plus = frequency > 0
+        f_minus = frequency < 0
+
+    if fmax is not None:
+        f_plus &= frequency < fmax
+        f_minus &= frequency > -fmax
+
+    if kmin is not None:
+        k_plus = wavenumber > kmin
+        k_minus = wavenumber < -kmin
+    else:
+        k_plus = np.ones_like(wavenumber, dtype=bool)
+        k_minus = np.ones_like(wavenumber, dtype=bool)
+
+    if kmax is not None:
+        k_plus &= wavenumber < kmax
+        k_minus &= wavenumber > -kmax
+
+    return (f_plus, k_plus), (f_minus, k_minus)
+
+def _box_index(selected : np.ndarray) -> slice | np.ndarray | None:
+    """
+    Indices of the True entries of a 1-D box, as a slice if they are
+    contiguous, or None if there are none.
+    """
+    index = np.flatnonzero(selected)
+    if index.size == 0:
+        return None
+    if index[-1] - index[0] + 1 == index.size:
+        return slice(index[0], index[-1] + 1)
+    return index
+
+def _fused_mask(wavenumber : np.ndarray,
+                frequency : np.ndarray,
+                box_plus : list,
+                box_minus : list,
+                conditions_plus : list,
+                conditions_minus : list) -> np.ndarray:
+    """
+    Evaluate a (frequency, wavenumber) mask only inside its bounding boxes.
+
+    Parameters
+    ----------
+    wavenumber, frequency : np.ndarray
+        1-D axes passed on to the conditions.
+
+    box_plus, box_minus : list
+        Bounding boxes for positive and negative frequencies, as returned
+        by `_bbox_predicates_1d`.
+
+    conditions_plus, conditions_minus : list
+        Callables `condition(wavenumber, frequency)` returning a boolean
+        array. They are called with the axes restricted to the box and
+        shaped (1, wavenumber) and (frequency, 1).
+
+    Returns
+    -------
+    mask : np.ndarray
+        Combined (frequency, wavenumber) mask.
+
+    Notes
+    -----
+    Every point outside the bounding boxes is masked out anyway, so the
+    2-D conditions are never evaluated on the full grid.
+    """
+    mask = np.zeros((frequency.size, wavenumber.size), dtype=bool)
+
+    for (f_box, k_box), conditions in [(box_plus, conditions_plus),
+                                       (box_minus, conditions_minus)]:
+        rows = _box_index(f_box)
+        cols = _box_index(k_box)
+        if rows is None or cols is None:
+            continue
+
+        wave = wavenumber[cols][np.newaxis, :]
+        freq = frequency[rows][:, np.newaxis]
+
+        box = np.ones((freq.size, wave.size), dtype=bool)
+        for condition in conditions:
+            box &= condition(wave, freq)
+
+        # Sorted axes give contiguous boxes, which are plain views
+        if isinstance(rows, slice) and isinstance(cols, slice):
+            mask[rows, cols] |= box
+        else:
+            mask[np.ix_(np.flatnonzero(f_box), np.flatnonzero(k_box))] |= box
+
+    return mask
+
+def _dispersion_condition(k_dim : np.ndarray,
+                          omega_dim : np.ndarray,
+                          func,
+                          op,
+                          h : float,
+                          n : int) -> np.ndarray:
+    """Dispersion relation `func` compared with `op` at equivalent depth h."""
+    k, omega = _nondim_k_omega(k_dim, omega_dim, h)
+    return func(op, omega, k, n)
+
+def _linear_condition(wavenumber : np.ndarray,
+                      frequency : np.ndarray,
+                      a : float,
+                      b : float,
+                      op) -> np.ndarray:
+    """Linear boundary a * frequency + wavenumber compared with `op` to b."""
+    return op(a * frequency + wavenumber, b)
+
 def kf_mask(wavenumber : xr.DataArray | np.ndarray,
             frequency : xr.DataArray | np.ndarray,
             fmin: float | None = None, 
             fmax: float | None = None, 
             kmin: int | None = None, 
             kmax: int | None = None,
-            return_individual: bool = False) -> xr.DataArray | tuple[list, list]:
+            return_individual: bool = False) -> xr.DataArray | tuple[tuple, tuple]:
     r"""
     A wavenumber-frequency filter for a combination of min/max frequency
     and min/max wavenumber.
@@ -171,50 +532,61 @@ def kf_mask(wavenumber : xr.DataArray | np.ndarray,
     Returns
     -------
     mask : xr.DataArray
+        If return_individual is False.
+
+    logical_plus, logical_minus : tuple[tuple, tuple]
+        If return_individual is True; (frequency condition, wavenumber
+        condition) pairs of 1-D np.ndarray for positive and negative
+        frequencies. The arrays are copies of the cached bounding boxes.
 
     Notes
     -----
     In order to have the right results, *I think* we need to select
     frequency with [-fmax, -fmin] & [-kmax, -kmin] \union 
     [fmin, fmax] & [kmin, kmax].
+
+    wavenumber and frequency may be dask-backed, but each must be
+    a single chunk. With return_individual=True the 1-D conditions are
+    computed eagerly from the axes' `.values`.
     """
     wavenumber, frequency = _wrap_to_xarray(wavenumber, frequency)
-
-    # do separately for positive and negative omega
-    logical_plus = [(frequency > 0)]  # bounding box for positive omega
-    logical_minus = [(frequency < 0)]  # bounding box for negative omega
-
-    # need to do separately for positive frequency and negative frequency
-    if fmin is not None:
-        assert fmin > 0, 'Frequency "fmin" must be greater than 0.'
-        logical_plus.append((frequency > fmin))
-        logical_minus.append((frequency < -fmin))
-
-    if fmax is not None:
-        assert fmax > 0, 'Frequency "fmax" must be greater than 0.'
-        logical_plus.append((frequency < fmax))
-        logical_minus.append((frequency > -fmax))
-
-    if kmin is not None:
-        logical_plus.append((wavenumber > kmin))
-        logical_minus.append((wavenumber < -kmin))
-
-    if kmax is not None:
-        logical_plus.append((wavenumber < kmax))
-        logical_minus.append((wavenumber > -kmax))
-
-    # Check if fmin and fmax are provided
-    if (fmin is not None) and (fmax is not None):
-        assert fmin < fmax, '"fmin" should be smaller than "fmax".'
-
-    if (kmin is not None) and (kmax is not None):
-        assert kmin < kmax, 'Wavenumber "kmin" should be smaller than "kmax".'
+    _check_bounds(fmin, fmax, kmin, kmax)
 
     # Filter both positive and negative frequencies (plus and minus)
     if return_individual:
-        return logical_plus, logical_minus
+        box_plus, box_minus = _bbox_predicates_1d(wavenumber.values,
+                                                  frequency.values,
+                                                  fmin,
+                                                  fmax,
+                                                  kmin,
+                                                  kmax)
+        return (tuple(cond.copy() for cond in box_plus),
+                tuple(cond.copy() for cond in box_minus))
     else:
-        return _combine_plus_minus(logical_plus, logical_minus)
+        return _apply_mask(_kf_mask_kernel,
+                           wavenumber,
+                           frequency,
+                           fmin=fmin,
+                           fmax=fmax,
+                           kmin=kmin,
+                           kmax=kmax)
+
+def _kf_mask_kernel(wavenumber : np.ndarray,
+                    frequency : np.ndarray,
+                    fmin: float | None = None, 
+                    fmax: float | None = None, 
+                    kmin: int | None = None, 
+                    kmax: int | None = None) -> np.ndarray:
+    """NumPy kernel of `kf_mask`."""
+    (f_plus, k_plus), (f_minus, k_minus) = _bbox_predicates_1d(wavenumber,
+                                                               frequency,
+                                                               fmin,
+                                                               fmax,
+                                                               kmin,
+                                                               kmax)
+
+    return _combine_plus_minus([f_plus[:, np.newaxis], k_plus[np.newaxis, :]],
+                               [f_minus[:, np.newaxis], k_minus[np.newaxis, :]])
     
 def wave_mask(wavenumber : xr.DataArray | np.ndarray,
               frequency : xr.DataArray | np.ndarray,
@@ -231,52 +603,85 @@ def wave_mask(wavenumber : xr.DataArray | np.ndarray,
         -----
         For TD-type wave, we do not attempt to nondimensionalize
         omega and k. 
+
+        wavenumber and frequency may be dask-backed, but each must be
+        a single chunk.
+
+        The most recent masks are cached; `clear_mask_cache` releases them.
         """
         wavenumber, frequency = _wrap_to_xarray(wavenumber, frequency)
 
         args = wave_args[wave_type]
         args.update(kwargs)
 
-        logical_plus, logical_minus = kf_mask(wavenumber, 
-                                              frequency,
-                                              args['fmin'],
-                                              args['fmax'],
-                                              args['kmin'],
-                                              args['kmax'], 
-                                              return_individual=True)
-
         if wave_type not in wave_types:
             raise ValueError(f'Unsupported wave_type "{wave_type}".')
 
-        # Select the dispersion relation function from class attributes
-        func = wave_func[wave_type]
-
-        hmin = args.get('hmin', None)
-        hmax = args.get('hmax', None)
-        n = args.get('n', 1)
-        
-        if hmin is not None:
-            k, omega = _nondim_k_omega(wavenumber, frequency, hmin)
-            logical_plus.append(func(operator.gt, omega, k, n))
-
-            # For IG, EIG, MRG, need to use gt because of Omega^2
-            if wave_type in ['ig', 'eig', 'mrg']:
-                logical_minus.append(func(operator.gt, omega, k, n))
-            # For ER and KW, use lt because of Omega
-            else:
-                logical_minus.append(func(operator.lt, omega, k, n))
-
-        if hmax is not None:
-            k, omega = _nondim_k_omega(wavenumber, frequency, hmax)
-            logical_plus.append(func(operator.lt, omega, k, n))
-
-            if wave_type in ['ig', 'eig', 'mrg']:
-                logical_minus.append(func(operator.lt, omega, k, n))
-            # For ER and KW, use gt because of Omega
-            else:
-                logical_minus.append(func(operator.gt, omega, k, n))
-
-        return _combine_plus_minus(logical_plus, logical_minus)
+        _check_bounds(args['fmin'], args['fmax'], args['kmin'], args['kmax'])
+
+        return _apply_mask(_memoized_kernel,
+                           wavenumber,
+                           frequency,
+                           mask_kernel=_wave_mask_kernel,
+                           wave_type=wave_type,
+                           fmin=args['fmin'],
+                           fmax=args['fmax'],
+                           kmin=args['kmin'],
+                           kmax=args['kmax'],
+                           hmin=args.get('hmin', None),
+                           hmax=args.get('hmax', None),
+                           n=args.get('n', 1))
+
+def _wave_mask_kernel(wavenumber : np.ndarray,
+                      frequency : np.ndarray,
+                      wave_type : str,
+                      fmin: float | None = None, 
+                      fmax: float | None = None, 
+                      kmin: int | None = None, 
+                      kmax: int | None = None,
+                      hmin: float | None = None,
+                      hmax: float | None = None,
+                      n: int = 1) -> np.ndarray:
+    """NumPy kernel of `wave_mask`."""
+    logical_plus, logical_minus = _bbox_predicates_1d(wavenumber, 
+                                                      frequency,
+                                                      fmin,
+                                                      fmax,
+                                                      kmin,
+                                                      kmax)
+
+    # Select the dispersion relation function from class attributes
+    func = wave_func[wave_type]
+
+    # The h-independent part of k and omega is computed only once
+    k_dim, omega_dim = _dim_k_omega(wavenumber, frequency)
+
+    dispersion = partial(_dispersion_condition, func=func, n=n)
+
+    conditions_plus, conditions_minus = [], []
+
+    if hmin is not None:
+        conditions_plus.append(partial(dispersion, op=operator.gt, h=hmin))
+
+        # For IG, EIG, MRG, need to use gt because of Omega^2
+        if wave_type in ['ig', 'eig', 'mrg']:
+            conditions_minus.append(partial(dispersion, op=operator.gt, h=hmin))
+        # For ER and KW, use lt because of Omega
+        else:
+            conditions_minus.append(partial(dispersion, op=operator.lt, h=hmin))
+
+    if hmax is not None:
+        conditions_plus.append(partial(dispersion, op=operator.lt, h=hmax))
+
+        if wave_type in ['ig', 'eig', 'mrg']:
+            conditions_minus.append(partial(dispersion, op=operator.lt, h=hmax))
+        # For ER and KW, use gt because of Omega
+        else:
+            conditions_minus.append(partial(dispersion, op=operator.gt, h=hmax))
+
+    return _fused_mask(k_dim, omega_dim,
+                       logical_plus, logical_minus,
+                       conditions_plus, conditions_minus)
 
 def td_mask(wavenumber : xr.DataArray | np.ndarray,
             frequency : xr.DataArray | np.ndarray,
@@ -308,6 +713,13 @@ def td_mask(wavenumber : xr.DataArray | np.ndarray,
     Returns
     -------
     mask : xr.DataArray
+
+    Notes
+    -----
+    wavenumber and frequency may be dask-backed, but each must be
+    a single chunk.
+
+    The most recent masks are cached; `clear_mask_cache` releases them.
     """
     wavenumber, frequency = _wrap_to_xarray(wavenumber, frequency)
 
@@ -315,15 +727,46 @@ def td_mask(wavenumber : xr.DataArray | np.ndarray,
     td_args = wave_args['td']
     td_args.update(kwargs)
 
-    logical_plus, logical_minus = kf_mask(wavenumber,
-                                          frequency,
-                                          td_args['fmin'], 
-                                          td_args['fmax'],
-                                          td_args['kmin'],
-                                          td_args['kmax'], 
-                                          return_individual=True)
+    _check_bounds(td_args['fmin'], td_args['fmax'], td_args['kmin'], td_args['kmax'])
+
+    # Fall back to the default boundaries if filter_dict is None
+    td_filter = td_args.get('filter_dict', None)
+    if td_filter is None:
+        td_filter = filter_dict
+
+    # Boundaries are passed as nested tuples so that the mask can be cached
+    boundaries = tuple((key, None if value is None else tuple(value))
+                       for key, value in td_filter.items())
+
+    return _apply_mask(_memoized_kernel,
+                       wavenumber,
+                       frequency,
+                       mask_kernel=_td_mask_kernel,
+                       fmin=td_args['fmin'],
+                       fmax=td_args['fmax'],
+                       kmin=td_args['kmin'],
+                       kmax=td_args['kmax'],
+                       boundaries=boundaries)
+
+def _td_mask_kernel(wavenumber : np.ndarray,
+                    frequency : np.ndarray,
+                    fmin: float | None = None, 
+                    fmax: float | None = None, 
+                    kmin: int | None = None, 
+                    kmax: int | None = None,
+                    boundaries: tuple = ()) -> np.ndarray:
+    """NumPy kernel of `td_mask`.
+
+    `boundaries` holds the items of `filter_dict` as (name, (a, b)) pairs.
+    """
+    logical_plus, logical_minus = _bbox_predicates_1d(wavenumber,
+                                                      frequency,
+                                                      fmin,
+                                                      fmax,
+                                                      kmin,
+                                                      kmax)
 
-    filter_dict = td_args.get('filter_dict', None)
+    filter_dict = dict(boundaries)
 
     upper = filter_dict.get('upper')
     lower = filter_dict.get('lower')
@@ -335,21 +778,27 @@ def td_mask(wavenumber : xr.DataArray | np.ndarray,
     right_a, right_b = (None, None) if right is None else right
     left_a, left_b = (None, None) if left is None else left
 
+    linear = _linear_condition
+    conditions_plus, conditions_minus = [], []
+
+    # a * f + k + b > 0 is the same test as a * f + k > -b
     if upper is not None:
-        logical_plus.append((upper_a * frequency + wavenumber < upper_b))
-        logical_minus.append((upper_a * frequency + wavenumber + upper_b > 0))
+        conditions_plus.append(partial(linear, a=upper_a, b=upper_b, op=operator.lt))
+        conditions_minus.append(partial(linear, a=upper_a, b=-upper_b, op=operator.gt))
 
     if lower is not None:
-        logical_plus.append((lower_a * frequency + wavenumber > lower_b))
-        logical_minus.append((lower_a * frequency + wavenumber + lower_b < 0))
+        conditions_plus.append(partial(linear, a=lower_a, b=lower_b, op=operator.gt))
+        conditions_minus.append(partial(linear, a=lower_a, b=-lower_b, op=operator.lt))
 
     # Test parallelogram construction
     if right is not None:
-        logical_plus.append((right_a * frequency + wavenumber < right_b))
-        logical_minus.append((right_a * frequency + wavenumber + right_b > 0))
+        conditions_plus.append(partial(linear, a=right_a, b=right_b, op=operator.lt))
+        conditions_minus.append(partial(linear, a=right_a, b=-right_b, op=operator.gt))
 
     if left is not None:
-        logical_plus.append((left_a * frequency + wavenumber > left_b))
-        logical_minus.append((left_a * frequency + wavenumber + left_b < 0))
+        conditions_plus.append(partial(linear, a=left_a, b=left_b, op=operator.gt))
+        conditions_minus.append(partial(linear, a=left_a, b=-left_b, op=operator.lt))
 
-    return _combine_plus_minus(logical_plus, logical_minus)
+    return _fused_mask(wavenumber, frequency,
+                       logical_plus, logical_minus,
+                       conditions_plus, conditions_minus)
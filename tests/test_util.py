@@ -0,0 +1,315 @@
+import copy
+import operator
+
+import numpy as np
+import pytest
+import xarray as xr
+
+import kf_filter.consts as consts
+from kf_filter import kf_mask, wave_mask, td_mask, clear_mask_cache
+from kf_filter.consts import g, radius_earth, beta, wave_func
+from kf_filter.util import _cached_mask, _cached_bbox, harmonic_func, split_hann_taper
+
+
+# Reference masks: every condition evaluated in float64 on the full
+# (frequency, wavenumber) grid, as in the original implementation
+def _reference_bbox(k, f, fmin=None, fmax=None, kmin=None, kmax=None):
+    shape = np.broadcast_shapes(k.shape, f.shape)
+    plus = [np.broadcast_to(f > 0, shape)]
+    minus = [np.broadcast_to(f < 0, shape)]
+
+    if fmin is not None:
+        plus.append(f > fmin)
+        minus.append(f < -fmin)
+
+    if fmax is not None:
+        plus.append(f < fmax)
+        minus.append(f > -fmax)
+
+    if kmin is not None:
+        plus.append(k > kmin)
+        minus.append(k < -kmin)
+
+    if kmax is not None:
+        plus.append(k < kmax)
+        minus.append(k > -kmax)
+
+    return plus, minus
+
+def _reference_combine(plus, minus):
+    return np.logical_and.reduce(np.broadcast_arrays(*plus)) \
+        | np.logical_and.reduce(np.broadcast_arrays(*minus))
+
+def _reference_nondim(k, f, h):
+    c = np.sqrt(g * h)
+    k_nondim = k / radius_earth * np.sqrt(c / beta)
+    omega_nondim = f * 2 * np.pi / (24 * 3600) / np.sqrt(beta * c)
+    return k_nondim, omega_nondim
+
+def _reference_kf_mask(wavenumber, frequency, **kwargs):
+    k, f = wavenumber[np.newaxis, :], frequency[:, np.newaxis]
+    return _reference_combine(*_reference_bbox(k, f, **kwargs))
+
+def _reference_wave_mask(wavenumber, frequency, wave_type, **kwargs):
+    args = dict(consts.wave_args[wave_type], **kwargs)
+    k, f = wavenumber[np.newaxis, :], frequency[:, np.newaxis]
+    plus, minus = _reference_bbox(k, f, args['fmin'], args['fmax'],
+                                  args['kmin'], args['kmax'])
+
+    func = wave_func[wave_type]
+    n = args.get('n', 1)
+    squared = wave_type in ['ig', 'eig', 'mrg']
+
+    if args.get('hmin') is not None:
+        k_nondim, omega = _reference_nondim(k, f, args['hmin'])
+        plus.append(func(operator.gt, omega, k_nondim, n))
+        op = operator.gt if squared else operator.lt
+        minus.append(func(op, omega, k_nondim, n))
+
+    if args.get('hmax') is not None:
+        k_nondim, omega = _reference_nondim(k, f, args['hmax'])
+        plus.append(func(operator.lt, omega, k_nondim, n))
+        op = operator.lt if squared else operator.gt
+        minus.append(func(op, omega, k_nondim, n))
+
+    return _reference_combine(plus, minus)
+
+def _reference_td_mask(wavenumber, frequency, **kwargs):
+    args = dict(consts.wave_args['td'], **kwargs)
+    k, f = wavenumber[np.newaxis, :], frequency[:, np.newaxis]
+    plus, minus = _reference_bbox(k, f, args['fmin'], args['fmax'],
+                                  args['kmin'], args['kmax'])
+
+    filter_dict = args.get('filter_dict') or {}
+    for side in ['upper', 'right']:
+        if side in filter_dict:
+            a, b = filter_dict[side]
+            plus.append(a * f + k < b)
+            minus.append(a * f + k + b > 0)
+    for side in ['lower', 'left']:
+        if side in filter_dict:
+            a, b = filter_dict[side]
+            plus.append(a * f + k > b)
+            minus.append(a * f + k + b < 0)
+
+    return _reference_combine(plus, minus)
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    # wave_mask and td_mask update the shared wave_args in place
+    monkeypatch.setattr(consts, 'wave_args', copy.deepcopy(consts.wave_args))
+    monkeypatch.setattr('kf_filter.util.wave_args', consts.wave_args)
+    clear_mask_cache()
+    yield
+    clear_mask_cache()
+
+@pytest.fixture(params=['unshifted', 'shifted'])
+def grid(request):
+    wavenumber = np.fft.fftfreq(144, 1 / 144)
+    frequency = np.fft.fftfreq(730, 0.25)
+    if request.param == 'shifted':
+        wavenumber = np.fft.fftshift(wavenumber)
+        frequency = np.fft.fftshift(frequency)
+    return wavenumber, frequency
+
+
+@pytest.mark.parametrize('kwargs', [
+    dict(),
+    dict(fmin=1 / 96, fmax=1 / 20, kmin=0, kmax=10),
+    dict(fmin=0.05, kmax=14),
+    dict(fmax=0.55, kmin=-15, kmax=-1),
+])
+def test_kf_mask(grid, kwargs):
+    wavenumber, frequency = grid
+    mask = kf_mask(wavenumber, frequency, **kwargs)
+    assert mask.dims == ('frequency', 'wavenumber')
+    np.testing.assert_array_equal(
+        mask.values, _reference_kf_mask(wavenumber, frequency, **kwargs))
+
+@pytest.mark.parametrize('wave_type', ['kelvin', 'er', 'eig', 'mrg', 'ig'])
+def test_wave_mask(grid, wave_type):
+    wavenumber, frequency = grid
+    mask = wave_mask(wavenumber, frequency, wave_type)
+    np.testing.assert_array_equal(
+        mask.values, _reference_wave_mask(wavenumber, frequency, wave_type))
+
+@pytest.mark.parametrize('wave_type, kwargs', [
+    ('kelvin', dict(fmin=None, kmax=None)),
+    ('er', dict(kmin=None, kmax=None, fmin=0.1)),
+    ('eig', dict(fmax=None, kmin=None)),
+    ('ig', dict(kmin=-5, kmax=5, fmax=0.2)),
+    ('mrg', dict(kmin=40, kmax=50)),
+])
+def test_wave_mask_bounding_box(grid, wave_type, kwargs):
+    # Conditions are only evaluated inside the bounding box, so boxes
+    # that are unbounded, narrow or empty must still match the full grid
+    wavenumber, frequency = grid
+    mask = wave_mask(wavenumber, frequency, wave_type, **kwargs)
+    expected = _reference_wave_mask(wavenumber, frequency, wave_type, **kwargs)
+    np.testing.assert_array_equal(mask.values, expected)
+
+def test_wave_mask_on_dispersion_curve():
+    # Points lying on the curve flip if k and omega lose precision
+    wavenumber = np.fft.fftfreq(360, 1 / 360)
+    frequency = np.fft.fftfreq(5508, 0.5)
+    kwargs = dict(kmin=-20, kmax=20, fmin=None, fmax=None, hmin=None, hmax=8.0)
+
+    mask = wave_mask(wavenumber, frequency, 'mrg', **kwargs)
+    expected = _reference_wave_mask(wavenumber, frequency, 'mrg', **kwargs)
+    np.testing.assert_array_equal(mask.values, expected)
+
+def test_td_mask(grid):
+    wavenumber, frequency = grid
+    mask = td_mask(wavenumber, frequency)
+    np.testing.assert_array_equal(
+        mask.values, _reference_td_mask(wavenumber, frequency))
+
+def test_td_mask_bounding_box(grid):
+    wavenumber, frequency = grid
+    filter_dict = {'upper': (84, 22), 'lower': (84, 13 / 2.5),
+                   'right': (-30, 30), 'left': (-30, -50)}
+    kwargs = dict(filter_dict=filter_dict, kmin=None, fmax=0.4)
+    mask = td_mask(wavenumber, frequency, **kwargs)
+    np.testing.assert_array_equal(
+        mask.values, _reference_td_mask(wavenumber, frequency, **kwargs))
+
+def test_td_mask_default_filter_dict(grid):
+    wavenumber, frequency = grid
+    expected = _reference_td_mask(wavenumber, frequency,
+                                  filter_dict=consts.filter_dict)
+
+    # None means the default boundaries, also for later default calls
+    for kwargs in [dict(filter_dict=None), dict()]:
+        mask = td_mask(wavenumber, frequency, **kwargs)
+        np.testing.assert_array_equal(mask.values, expected)
+
+@pytest.mark.parametrize('kwargs', [
+    dict(fmin=-0.1),
+    dict(fmax=0),
+    dict(fmin=0.4, fmax=0.1),
+    dict(kmin=5, kmax=1),
+])
+def test_invalid_bounds(grid, kwargs):
+    wavenumber, frequency = grid
+    with pytest.raises(ValueError):
+        kf_mask(wavenumber, frequency, **kwargs)
+
+def test_return_individual(grid):
+    wavenumber, frequency = grid
+    kwargs = dict(fmin=0.05, fmax=0.4, kmin=-10, kmax=14)
+    logical_plus, logical_minus = kf_mask(wavenumber, frequency,
+                                          return_individual=True, **kwargs)
+
+    (f_plus, k_plus), (f_minus, k_minus) = logical_plus, logical_minus
+    mask = (f_plus[:, np.newaxis] & k_plus) | (f_minus[:, np.newaxis] & k_minus)
+    np.testing.assert_array_equal(
+        mask, _reference_kf_mask(wavenumber, frequency, **kwargs))
+
+    # Modifying the returned arrays leaves the cached boxes untouched
+    f_plus[:] = False
+    again, _ = kf_mask(wavenumber, frequency, return_individual=True, **kwargs)
+    assert again[0].any()
+
+def test_mask_cache(grid):
+    wavenumber, frequency = grid
+    first = wave_mask(wavenumber, frequency, 'kelvin')
+    assert _cached_mask.cache_info().misses == 1
+
+    second = wave_mask(wavenumber.copy(), frequency.copy(), 'kelvin')
+    assert _cached_mask.cache_info().hits == 1
+    np.testing.assert_array_equal(first.values, second.values)
+
+    # Callers get a copy, so modifying it leaves the cached mask intact
+    second.values[:] = ~second.values
+    third = wave_mask(wavenumber, frequency, 'kelvin')
+    np.testing.assert_array_equal(first.values, third.values)
+
+    # A different equivalent depth is a different mask
+    wave_mask(wavenumber, frequency, 'kelvin', hmax=50)
+    assert _cached_mask.cache_info().misses == 2
+
+    clear_mask_cache()
+    assert _cached_mask.cache_info().currsize == 0
+    assert _cached_bbox.cache_info().currsize == 0
+
+def test_unhashable_parameters(grid):
+    # 0-d arrays cannot key the caches, so they are evaluated uncached
+    wavenumber, frequency = grid
+    mask = wave_mask(wavenumber, frequency, 'kelvin', hmin=np.array(10.))
+    np.testing.assert_array_equal(
+        mask.values,
+        _reference_wave_mask(wavenumber, frequency, 'kelvin', hmin=10.))
+
+    mask = kf_mask(wavenumber, frequency, fmin=np.array(0.05), kmax=np.array(14))
+    np.testing.assert_array_equal(
+        mask.values,
+        _reference_kf_mask(wavenumber, frequency, fmin=0.05, kmax=14))
+
+@pytest.mark.parametrize('npts', [0, 1, 2, 3, 4, 7, 10, 101, 146, 730])
+def test_split_hann_taper(npts):
+    series_length = 730
+    taper = split_hann_taper(series_length, npts / series_length)
+
+    # The first half of np.hanning(npts) is applied at the start of the
+    # series and the second half at the end
+    expected = np.ones(series_length)
+    if npts >= 2:
+        window = np.hanning(npts)
+        n_head = npts // 2 + 1
+        expected[:n_head] = window[:n_head]
+        expected[series_length - (npts - n_head):] = window[n_head:]
+    np.testing.assert_array_equal(taper, expected)
+
+def _dask_axes(wavenumber, frequency, chunks=-1):
+    pytest.importorskip('dask')
+    wavenumber = xr.DataArray(wavenumber, coords=dict(wavenumber=wavenumber))
+    frequency = xr.DataArray(frequency, coords=dict(frequency=frequency))
+    return wavenumber.chunk(chunks), frequency.chunk(chunks)
+
+@pytest.mark.parametrize('mask_func, kwargs', [
+    (kf_mask, dict(fmin=0.05, fmax=0.4, kmin=-10, kmax=14)),
+    (wave_mask, dict(wave_type='kelvin')),
+    (wave_mask, dict(wave_type='er')),
+    (td_mask, dict()),
+])
+def test_dask_axes(grid, mask_func, kwargs):
+    wavenumber, frequency = grid
+    expected = mask_func(wavenumber, frequency, **kwargs)
+
+    dask_array = pytest.importorskip('dask.array')
+    mask = mask_func(*_dask_axes(wavenumber, frequency), **kwargs)
+    assert isinstance(mask.data, dask_array.Array)
+    np.testing.assert_array_equal(mask.compute().values, expected.values)
+
+def test_dask_multiple_chunks(grid):
+    wavenumber, frequency = grid
+    with pytest.raises(ValueError):
+        kf_mask(*_dask_axes(wavenumber, frequency, chunks=50)).compute()
+
+@pytest.mark.parametrize('mask_func, kwargs', [
+    (kf_mask, dict(fmin=-0.1)),
+    (wave_mask, dict(wave_type='kelvin', kmin=5, kmax=1)),
+    (td_mask, dict(fmin=0.4, fmax=0.1)),
+])
+def test_dask_invalid_bounds(grid, mask_func, kwargs):
+    # Bounds are checked before the lazy mask is built, not on compute
+    wavenumber, frequency = grid
+    with pytest.raises(ValueError):
+        mask_func(*_dask_axes(wavenumber, frequency), **kwargs)
+
+@pytest.mark.parametrize('period', [365, 365.25])
+@pytest.mark.parametrize('num_fs', [0, 1, 2, 4, 50])
+def test_harmonic_func(num_fs, period):
+    n = 14600
+    func = harmonic_func(n, period=period, num_fs=num_fs)
+
+    # Rows are 1, then sin(i * time), cos(i * time) for i = 0, ..., num_fs - 1
+    time = np.arange(0, n) * 2 * np.pi / period
+    expected = [np.ones(n)]
+    for i in range(num_fs):
+        expected += [np.sin(i * time), np.cos(i * time)]
+
+    assert func.shape == (2 * num_fs + 1, n)
+    # The recurrence stays within ~4e-12 of the direct evaluation
+    np.testing.assert_allclose(func, np.array(expected), rtol=0, atol=1e-10)